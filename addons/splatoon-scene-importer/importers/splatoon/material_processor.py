@@ -1,34 +1,72 @@
 import os
 import bpy
 import re
+import numpy as np
+
+# base texture 판별용 suffix 패턴 (모듈 로드시 한번만 컴파일)
+_BASE_SUFFIXES = ('_alb', '_emm', '_emi')
+_BASE_SUFFIX_RE = re.compile('|'.join(re.escape(suffix) for suffix in _BASE_SUFFIXES), re.IGNORECASE)
+
+# blender가 중복 이름에 붙이는 '.001' 형태의 suffix
+_BLENDER_SUFFIX_RE = re.compile(r'\.\d+$')
+
+# 흑백 판별시 전체 검사 전에 먼저 확인할 픽셀 간격
+_GRAYSCALE_SAMPLE_STRIDE = 64
 
 class MaterialProcessor:
-    def __init__(self, material, file_path):
+    # 디렉토리별 {소문자 파일명: 실제 파일명} 캐시
+    _dir_cache = {}
+    # prefetch 중인 {texture 경로: Future}
+    _prefetch_futures = {}
+    # {(image 경로, non_color): Image}, 같은 colorspace끼리만 datablock을 공유한다
+    _image_cache = {}
+    # {image 경로: 흑백 여부}
+    _grayscale_cache = {}
+
+    def __init__(self, material, file_path, base_name=None):
         self.material = material
         self.file_path = file_path
-        self.base_name = self._find_base_texture() or self._find_base_from_material()
+        self._nodes = material.node_tree.nodes
+        self._links = material.node_tree.links
+
         self.principled_node = self._init_principled_node()
+
+        # Principled BSDF가 없는 material은 처리하지 않는다 (caller에서 has_principled로 확인)
+        if not self.has_principled():
+            self.base_name = None
+            self._existing_tex_by_suffix = {}
+            self.base_x_position = None
+            self.base_color_node = None
+            return
+
+        self.base_name = base_name or self.resolve_base_name(material, file_path)
+        self._existing_tex_by_suffix = self._init_existing_tex_by_suffix()
         self.base_x_position = self.principled_node.location.x - 900
 
         # 2nd texture의 영향을 받지않은 node보관용 emission에서 사용한다
         self.base_color_node = self._init_base_color_node()
 
+    def has_principled(self):
+        return self.principled_node is not None
+
     def _init_principled_node(self):
-        nodes = self.material.node_tree.nodes
-        links = self.material.node_tree.links
+        nodes = self._nodes
+        links = self._links
 
         # 기존 Principled BSDF 찾기
-        principled = None
-        for node in nodes:
-            if node.type == 'BSDF_PRINCIPLED':
-                principled = node
-                break
-
-        # 연결 정보 저장
-        input_links = {link.to_socket.name: link.from_node.outputs[link.from_socket.name]
-                       for link in links if link.to_node == principled}
-        output_links = {link.from_socket.name: link.to_node.inputs[link.to_socket.name]
-                        for link in links if link.from_node == principled}
+        principled = self.find_principled_node(nodes)
+        if principled is None:
+            return None
+
+        # 연결 정보 저장 (links를 한번만 순회하여 입력/출력 link를 나눈다)
+        # NodeSocket.links는 호출마다 tree의 전체 links를 순회하므로 사용하지 않는다
+        input_links = {}
+        output_links = {}
+        for link in links:
+            if link.to_node == principled:
+                input_links[link.to_socket.name] = link.from_node.outputs[link.from_socket.name]
+            elif link.from_node == principled:
+                output_links[link.from_socket.name] = link.to_node.inputs[link.to_socket.name]
         principled_location = principled.location
 
         # 기존 Principled BSDF 삭제
@@ -49,6 +87,44 @@ class MaterialProcessor:
 
         return new_principled
 
+    @staticmethod
+    def find_principled_node(nodes):
+        for node in nodes:
+            if node.type == 'BSDF_PRINCIPLED':
+                return node
+        return None
+
+    def _find_output_node(self):
+        """Principled BSDF가 연결된 Material Output node (없으면 tree에서 검색)"""
+        for link in self.principled_node.outputs['BSDF'].links:
+            if link.to_node.type == 'OUTPUT_MATERIAL':
+                return link.to_node
+        for node in self._nodes:
+            if node.type == 'OUTPUT_MATERIAL':
+                return node
+        return None
+
+    def _add_mix(self, blend_type, location, in1=None, in2=None, fac=1.0, fac_in=None, color2=None, label=None, hide=False):
+        """MixRGB node를 생성하고 주어진 socket들을 연결한다"""
+        mix_node = self._nodes.new('ShaderNodeMixRGB')
+        mix_node.blend_type = blend_type
+        mix_node.location = location
+        mix_node.hide = hide
+        if label:
+            mix_node.label = label
+        if fac is not None:
+            mix_node.inputs['Fac'].default_value = fac
+        if color2 is not None:
+            mix_node.inputs[2].default_value = color2
+
+        if in1 is not None:
+            self._links.new(in1, mix_node.inputs[1])
+        if in2 is not None:
+            self._links.new(in2, mix_node.inputs[2])
+        if fac_in is not None:
+            self._links.new(fac_in, mix_node.inputs['Fac'])
+        return mix_node
+
     def _init_base_color_node(self):
         ao_node = self.import_texture('_ao', non_color=True, location_y=self.principled_node.location.y + 50)
         tcl_node = self.import_texture('_tcl', non_color=True, location_y=self.principled_node.location.y + 100)
@@ -60,103 +136,240 @@ class MaterialProcessor:
         base_color_node.location = (self.base_x_position, self.principled_node.location.y)
         base_color_node.hide = True
 
-        alb_multiple_node = self.material.node_tree.nodes.new('ShaderNodeMixRGB')
-        alb_multiple_node.location = (base_color_node.location.x + 300, base_color_node.location.y + 100)
-        alb_multiple_node.label = 'Alb Multiply'
-        alb_multiple_node.blend_type = 'MULTIPLY'
-        alb_multiple_node.inputs['Fac'].default_value = 1.0
-        alb_multiple_node.inputs[2].default_value = (1, 1, 1, 1)
-        self.material.node_tree.links.new(base_color_node.outputs['Color'], alb_multiple_node.inputs[1])
-        final_base_node = alb_multiple_node
+        final_base_node = self._add_mix(
+            'MULTIPLY',
+            (base_color_node.location.x + 300, base_color_node.location.y + 100),
+            in1=base_color_node.outputs['Color'],
+            color2=(1, 1, 1, 1),
+            label='Alb Multiply'
+        )
 
         if ao_node:
-            ao_multiple_color_node = self.material.node_tree.nodes.new('ShaderNodeMixRGB')
-            ao_multiple_color_node.blend_type = 'MULTIPLY'
-            ao_multiple_color_node.inputs['Fac'].default_value = 1.0
-            ao_multiple_color_node.inputs[2].default_value = (1, 1, 1, 1)
-            ao_multiple_color_node.location = (final_base_node.location.x + 200, final_base_node.location.y)
-            ao_multiple_color_node.hide = True
-            self.material.node_tree.links.new(final_base_node.outputs['Color'], ao_multiple_color_node.inputs[1])
-            self.material.node_tree.links.new(ao_node.outputs['Color'], ao_multiple_color_node.inputs[2])
-            final_base_node = ao_multiple_color_node
+            final_base_node = self._add_mix(
+                'MULTIPLY',
+                (final_base_node.location.x + 200, final_base_node.location.y),
+                in1=final_base_node.outputs['Color'],
+                in2=ao_node.outputs['Color'],
+                hide=True
+            )
 
         if tcl_node:
-            mix_color_node = self.material.node_tree.nodes.new('ShaderNodeMixRGB')
-            mix_color_node.label = 'Tcl Mix'
-            mix_color_node.blend_type = 'MIX'
-            mix_color_node.inputs[2].default_value = (1, 1, 1, 1)
-            mix_color_node.location = (final_base_node.location.x + 200, final_base_node.location.y)
-            self.material.node_tree.links.new(final_base_node.outputs['Color'], mix_color_node.inputs[1])
-            self.material.node_tree.links.new(tcl_node.outputs['Color'], mix_color_node.inputs['Fac'])
-            final_base_node = mix_color_node
-
-        self.material.node_tree.links.new(final_base_node.outputs['Color'], self.principled_node.inputs['Base Color'])
+            final_base_node = self._add_mix(
+                'MIX',
+                (final_base_node.location.x + 200, final_base_node.location.y),
+                in1=final_base_node.outputs['Color'],
+                fac=None,
+                fac_in=tcl_node.outputs['Color'],
+                color2=(1, 1, 1, 1),
+                label='Tcl Mix'
+            )
+
+        self._links.new(final_base_node.outputs['Color'], self.principled_node.inputs['Base Color'])
 
         return final_base_node
 
-    def _find_base_texture(self):
-        # Define base suffixes
-        suffixes = ['_alb', '_emm', '_emi']
+    @classmethod
+    def resolve_base_name(cls, material, dir_path):
+        """
+        Try the cheap material name first and only scan the texture nodes
+        when no base texture file exists for it in the directory.
+        """
+        base_name = cls._find_base_from_material(material)
+        if base_name:
+            dir_index = cls._get_dir_index(dir_path)
+            base_lower = base_name.lower()
+            if any(f"{base_lower}{suffix}.png" in dir_index for suffix in _BASE_SUFFIXES):
+                return base_name
 
-        # 각 suffix를 정규표현식 패턴으로 변환
-        # re.escape()를 사용하여 특수문자가 있을 경우 처리
-        patterns = [re.compile(re.escape(suffix), re.IGNORECASE) for suffix in suffixes]
+        return cls._find_base_texture(material.node_tree.nodes) or base_name
 
-        for node in self.material.node_tree.nodes:
+    @classmethod
+    def _find_base_texture(cls, nodes):
+        for node in nodes:
             if node.type == 'TEX_IMAGE' and node.image:
-                image_path = bpy.path.abspath(node.image.filepath)
-                basename = os.path.basename(image_path)
-
-                # 각 패턴에 대해 검사
-                for pattern, original_suffix in zip(patterns, suffixes):
-                    match = pattern.search(basename)
-                    if match:
-                        # 실제 찾은 suffix를 사용
-                        # found_suffix = basename[match.start():match.end()]
-                        base_name = basename[:match.start()]
-                        return base_name
+                basename = cls._image_basename(node.image)
+
+                # 정규표현식 전에 단순 substring 검사로 대상이 아닌 image를 건너뛴다
+                basename_lower = basename.lower()
+                if not any(suffix in basename_lower for suffix in _BASE_SUFFIXES):
+                    continue
+
+                # 모든 suffix를 한번에 검사
+                match = _BASE_SUFFIX_RE.search(basename)
+                if match:
+                    return basename[:match.start()]
 
         return None
 
-    def _find_base_from_material(self):
+    @staticmethod
+    def _image_basename(image):
+        # basename만 필요하므로 bpy.path.abspath로 '//' 상대경로를 풀지 않는다
+        return os.path.basename(image.filepath) or image.name
+
+    def _init_existing_tex_by_suffix(self):
+        """
+        이미 import된 {base_name}{suffix}.png texture node를 suffix(소문자) 기준으로 보관
+        다른 socket에 연결된 node는 옮기면 안되므로 연결되지 않은 node만 대상으로 한다
+        """
+        existing = {}
+        if not self.base_name:
+            return existing
+
+        prefix = self.base_name.lower()
+        for node in self._nodes:
+            if node.type == 'TEX_IMAGE' and node.image and not any(output.is_linked for output in node.outputs):
+                basename = self._image_basename(node.image).lower()
+                if basename.startswith(prefix) and basename.endswith('.png'):
+                    existing.setdefault(basename[len(prefix):-len('.png')], node)
+        return existing
+
+    @staticmethod
+    def _find_base_from_material(material):
         """Extract base_name from the material name."""
-        if not self.material:
+        if not material:
             return None  # If no material is provided, return None
 
         # Remove suffixes like '.001', '.002', etc.
-        return self.material.name.split('.')[0]
+        return _BLENDER_SUFFIX_RE.sub('', material.name)
+
+    @classmethod
+    def clear_caches(cls):
+        cls._dir_cache.clear()
+        cls._image_cache.clear()
+        cls._grayscale_cache.clear()
+        cls.clear_prefetch()
+
+    @classmethod
+    def clear_prefetch(cls):
+        # 아직 시작하지 않은 prefetch는 취소한다
+        for future in cls._prefetch_futures.values():
+            future.cancel()
+        cls._prefetch_futures.clear()
+
+    @classmethod
+    def _get_dir_index(cls, dir_path):
+        """디렉토리를 한번만 scan하여 대소문자 무시 파일명 index를 반환"""
+        dir_index = cls._dir_cache.get(dir_path)
+        if dir_index is None:
+            try:
+                with os.scandir(dir_path) as it:
+                    dir_index = {entry.name.lower(): entry.name for entry in it if entry.is_file()}
+            except OSError:
+                dir_index = {}
+            cls._dir_cache[dir_path] = dir_index
+        return dir_index
+
+    @staticmethod
+    def _image_key(path):
+        if not path:
+            return None
+        return os.path.normcase(os.path.normpath(bpy.path.abspath(path)))
+
+    @classmethod
+    def _apply_colorspace(cls, tex_image_node, non_color):
+        """
+        texture node의 image colorspace를 맞춘다.
+        같은 경로, 같은 colorspace의 image가 이미 있으면 그것을 공유하고,
+        다른 곳에서도 사용중인 image는 colorspace를 바꾸지 않고 복사본을 사용한다.
+        """
+        image = tex_image_node.image
+        key = cls._image_key(image.filepath)
+        if (image.colorspace_settings.name == 'Non-Color') == non_color:
+            if key:
+                cls._image_cache.setdefault((key, non_color), image)
+            return
+
+        cached_image = cls._image_cache.get((key, non_color)) if key else None
+        if cached_image:
+            tex_image_node.image = cached_image
+            return
+
+        if image.users > 1:
+            image = image.copy()
+            tex_image_node.image = image
+        elif key and cls._image_cache.get((key, not non_color)) == image:
+            # 그대로 colorspace를 바꾸므로 이전 colorspace의 cache에서 제거
+            del cls._image_cache[(key, not non_color)]
+        image.colorspace_settings.name = 'Non-Color' if non_color else 'sRGB'
+        if key:
+            cls._image_cache[(key, non_color)] = image
+
+    @staticmethod
+    def _read_file(path):
+        # 내용은 버리고 OS page cache만 채운다
+        with open(path, 'rb') as f:
+            while f.read(1 << 20):
+                pass
+
+    @classmethod
+    def prefetch_textures(cls, executor, requests, dir_path):
+        """
+        Warm the OS page cache for the textures import_texture will load.
+        bpy.data.images.load must run on the main thread, so the files are only
+        read by the executor while the node trees are being built.
+        requests는 (base_name, suffixes) 목록이며, suffix가 tuple이면 처음 존재하는 파일만 읽는다.
+        """
+        dir_index = cls._get_dir_index(dir_path)
+        for base_name, suffixes in requests:
+            if not base_name:
+                continue
+            base_lower = base_name.lower()
+            for suffix in suffixes:
+                alternatives = suffix if isinstance(suffix, tuple) else (suffix,)
+                for alternative in alternatives:
+                    real_name = dir_index.get(f"{base_lower}{alternative}.png")
+                    if real_name:
+                        break
+                else:
+                    continue
+                path = os.path.join(dir_path, real_name)
+                if path not in cls._prefetch_futures:
+                    cls._prefetch_futures[path] = executor.submit(cls._read_file, path)
 
     def import_texture(self, suffix, non_color=False, location_x=None, location_y=0):
+        """non_color가 None이면 흑백 texture일 때 Non-Color로 불러온다"""
         if not location_x:
             location_x = self.base_x_position
 
-        # Find the actual texture file with case-insensitive suffix
-        def find_texture_file(dir_path, base, sfx):
-            # Get all files in the directory
-            try:
-                files = os.listdir(dir_path)
-                expected_filename = f"{base}{sfx}.png"
-
-                # Case-insensitive search for the file
-                for file in files:
-                    if file.lower() == expected_filename.lower():
-                        return os.path.join(dir_path, file)
-            except (OSError, FileNotFoundError):
-                return None
-            return None
+        # 이미 tree에 있는 texture node는 disk를 다시 보지않고 재사용한다
+        tex_image_node = self._existing_tex_by_suffix.pop(suffix.lower(), None)
+        if tex_image_node:
+            tex_image_node.hide = True
+            tex_image_node.location = (location_x, location_y)
+            if non_color is None:
+                non_color = self._is_grayscale(tex_image_node.image)
+            self._apply_colorspace(tex_image_node, non_color)
+            return tex_image_node
 
-        texture_path = find_texture_file(self.file_path, self.base_name, suffix)
-        if not texture_path:
+        # Find the actual texture file with case-insensitive suffix
+        dir_index = self._get_dir_index(self.file_path)
+        real_name = dir_index.get(f"{self.base_name}{suffix}.png".lower())
+        if not real_name:
             return False
+        texture_path = os.path.join(self.file_path, real_name)
+
+        # prefetch 중인 파일은 같은 파일을 동시에 읽지 않도록 읽기가 끝날때까지 기다린다
+        prefetch_future = self._prefetch_futures.pop(texture_path, None)
+        if prefetch_future:
+            prefetch_future.result()
+
+        # 여러 material이 같은 texture를 공유하면 같은 colorspace의 image datablock을 재사용한다
+        # colorspace는 공유하기 전에 정한다 (흑백 여부는 경로별로 한번만 판별)
+        key = self._image_key(texture_path)
+        if non_color is None:
+            non_color = self._grayscale_cache.get(key)
+        image = self._image_cache.get((key, non_color)) if non_color is not None else None
+        if image is None:
+            image = bpy.data.images.load(texture_path, check_existing=True)
+            if non_color is None:
+                non_color = self._is_grayscale(image)
 
         # Create a new image texture node
-        tex_image_node = self.material.node_tree.nodes.new('ShaderNodeTexImage')
-        tex_image_node.image = bpy.data.images.load(texture_path)
+        tex_image_node = self._nodes.new('ShaderNodeTexImage')
+        tex_image_node.image = image
         tex_image_node.hide = True
         tex_image_node.location = (location_x, location_y)
-
-        if non_color:
-            tex_image_node.image.colorspace_settings.name = 'Non-Color'
+        self._apply_colorspace(tex_image_node, non_color)
 
         return tex_image_node
 
@@ -173,44 +386,43 @@ class MaterialProcessor:
 
         tex_image_node = self.import_texture(suffix, non_color, location_x, location_y)
         if tex_image_node:
-            self.material.node_tree.links.new(tex_image_node.outputs['Color'], self.principled_node.inputs[input_name])
+            self._links.new(tex_image_node.outputs['Color'], self.principled_node.inputs[input_name])
 
     def import_alpha(self):
         if self.principled_node.inputs['Alpha'].is_linked:
             imported_alpha_node = self.principled_node.inputs['Alpha'].links[0].from_node
-            self.material.node_tree.links.remove(self.principled_node.inputs['Alpha'].links[0])
-            self.material.node_tree.nodes.remove(imported_alpha_node)
+            self._links.remove(self.principled_node.inputs['Alpha'].links[0])
+            self._nodes.remove(imported_alpha_node)
 
         alpha_node = self.import_texture('_opa', non_color=True)
 
         if alpha_node:
             alpha_node.hide = True
             alpha_node.location = (self.base_x_position, self.principled_node.location.y - 135)
-            math_node = self.material.node_tree.nodes.new('ShaderNodeMath')
+            math_node = self._nodes.new('ShaderNodeMath')
             math_node.hide = True
             math_node.location = (alpha_node.location.x + 700, alpha_node.location.y)
             math_node.operation = 'GREATER_THAN'
-            self.material.node_tree.links.new(alpha_node.outputs['Color'], math_node.inputs['Value'])
-            self.material.node_tree.links.new(math_node.outputs['Value'], self.principled_node.inputs['Alpha'])
+            self._links.new(alpha_node.outputs['Color'], math_node.inputs['Value'])
+            self._links.new(math_node.outputs['Value'], self.principled_node.inputs['Alpha'])
 
     def import_normal(self):
         tex_image_node = self.import_texture('_nrm', non_color=True)
         if not tex_image_node:
             return
 
-        for link in self.material.node_tree.links:
-            if (link.to_node == self.principled_node and link.to_socket.name == 'Normal'):
-                normal_map_node = link.from_node
-
+        # 이미 Normal에 연결된 node가 있으면 재사용, 없으면 None
+        normal_links = self.principled_node.inputs['Normal'].links
+        normal_map_node = normal_links[0].from_node if normal_links else None
         if not normal_map_node:
-            normal_map_node = self.material.node_tree.nodes.new('ShaderNodeNormalMap')
-            self.material.node_tree.links.new(normal_map_node.outputs['Normal'], self.principled_node.inputs['Normal'])
+            normal_map_node = self._nodes.new('ShaderNodeNormalMap')
+            self._links.new(normal_map_node.outputs['Normal'], self.principled_node.inputs['Normal'])
         normal_map_node.hide = True
 
         tex_image_node.location = (self.base_x_position, self.principled_node.location.y - 180)
         normal_map_node.location = (tex_image_node.location.x + 300, tex_image_node.location.y)
 
-        self.material.node_tree.links.new(tex_image_node.outputs['Color'], normal_map_node.inputs['Color'])
+        self._links.new(tex_image_node.outputs['Color'], normal_map_node.inputs['Color'])
 
     def import_second_color(self):
         trm_node = self.import_texture('_trm', location_y=self.principled_node.location.y + 300)
@@ -219,48 +431,45 @@ class MaterialProcessor:
         if not self.principled_node.inputs['Base Color'].is_linked or (not trm_node and not mai_node and not thc_node):
             return
         base_color_node = self.principled_node.inputs['Base Color'].links[0].from_node
-        nodes = self.material.node_tree.nodes
-        links = self.material.node_tree.links
+        nodes = self._nodes
+        links = self._links
 
         # Create and setup screen node
-        screen_node = nodes.new('ShaderNodeMixRGB')
-        screen_node.blend_type = 'SCREEN'
-        screen_node.inputs['Fac'].default_value = 1.0
-        screen_node.inputs[2].default_value = (0, 0, 0, 1)
-        screen_node.hide = True
-        screen_node.location = (self.principled_node.location.x, self.principled_node.location.y + 200)
-        links.new(base_color_node.outputs['Color'], screen_node.inputs[1])
+        screen_node = self._add_mix(
+            'SCREEN',
+            (self.principled_node.location.x, self.principled_node.location.y + 200),
+            in1=base_color_node.outputs['Color'],
+            color2=(0, 0, 0, 1),
+            hide=True
+        )
         second_texture_node = screen_node
 
         # trm process
         if trm_node:
-            trm_multiple_node = nodes.new('ShaderNodeMixRGB')
-            trm_multiple_node.label = 'Trm Multiply'
-            trm_multiple_node.blend_type = 'MULTIPLY'
-            trm_multiple_node.inputs['Fac'].default_value = 1.0
-            trm_multiple_node.inputs[2].default_value = (0, 0, 0, 1)
-            trm_multiple_node.location = (trm_node.location.x + 300, trm_node.location.y)
-            links.new(trm_node.outputs['Color'], trm_multiple_node.inputs[1])
-
-            trm_second_screen_node = nodes.new('ShaderNodeMixRGB')
-            trm_second_screen_node.label = 'Trm Second Screen'
-            trm_second_screen_node.blend_type = 'SCREEN'
-            trm_second_screen_node.inputs['Fac'].default_value = 1.0
-            trm_second_screen_node.inputs[2].default_value = (0, 0, 0, 1)
-            links.new(trm_multiple_node.outputs['Color'], trm_second_screen_node.inputs[1])
-            trm_second_screen_node.location = (trm_node.location.x + 500, trm_node.location.y)
-            second_texture_node = trm_second_screen_node
+            trm_multiple_node = self._add_mix(
+                'MULTIPLY',
+                (trm_node.location.x + 300, trm_node.location.y),
+                in1=trm_node.outputs['Color'],
+                color2=(0, 0, 0, 1),
+                label='Trm Multiply'
+            )
+            second_texture_node = self._add_mix(
+                'SCREEN',
+                (trm_node.location.x + 500, trm_node.location.y),
+                in1=trm_multiple_node.outputs['Color'],
+                color2=(0, 0, 0, 1),
+                label='Trm Second Screen'
+            )
 
         # mai process
         if mai_node:
-            mai_multiple_node = nodes.new('ShaderNodeMixRGB')
-            mai_multiple_node.blend_type = 'MULTIPLY'
-            mai_multiple_node.hide = True
-            mai_multiple_node.location = (mai_node.location.x + 700, mai_node.location.y)
-            mai_multiple_node.inputs['Fac'].default_value = 1.0
-            links.new(mai_node.outputs['Color'], mai_multiple_node.inputs[2])
-            links.new(second_texture_node.outputs['Color'], mai_multiple_node.inputs[1])
-            second_texture_node = mai_multiple_node
+            second_texture_node = self._add_mix(
+                'MULTIPLY',
+                (mai_node.location.x + 700, mai_node.location.y),
+                in1=second_texture_node.outputs['Color'],
+                in2=mai_node.outputs['Color'],
+                hide=True
+            )
 
         # connect second_texture_node
         if second_texture_node != screen_node:
@@ -288,25 +497,25 @@ class MaterialProcessor:
         mai_node = self.import_texture('_mai', non_color=True, location_y=self.principled_node.location.y + 800)
 
         if trm_node:
-            nodes = self.material.node_tree.nodes
-            links = self.material.node_tree.links
+            nodes = self._nodes
+            links = self._links
+            # node 생성과 link 생성을 섞지않고, link는 모아서 마지막에 한번에 생성한다
+            pending_links = []
 
             # Create and setup multiply mix node
-            multiple_color_node = nodes.new('ShaderNodeMixRGB')
-            multiple_color_node.label = 'Trm Multiply'
-            multiple_color_node.blend_type = 'MULTIPLY'
-            multiple_color_node.inputs['Fac'].default_value = 1.0
-            multiple_color_node.inputs[2].default_value = (0, 0, 0, 1)
-            multiple_color_node.location = (trm_node.location.x + 300, trm_node.location.y)
-
-            # Connect _trm to mix color
-            links.new(trm_node.outputs['Color'], multiple_color_node.inputs[1])  # A input
+            multiple_color_node = self._add_mix(
+                'MULTIPLY',
+                (trm_node.location.x + 300, trm_node.location.y),
+                color2=(0, 0, 0, 1),
+                label='Trm Multiply'
+            )
+            pending_links.append((trm_node.outputs['Color'], multiple_color_node.inputs[1]))  # Connect _trm to A input
 
             # Create and setup toBSDF
             to_shade_node = nodes.new('ShaderNodeBsdfDiffuse')
             to_shade_node.location = (multiple_color_node.location.x + 200, multiple_color_node.location.y)
             to_shade_node.hide = True
-            links.new(multiple_color_node.outputs['Color'], to_shade_node.inputs['Color'])
+            pending_links.append((multiple_color_node.outputs['Color'], to_shade_node.inputs['Color']))
 
             # Create 2nd trm RGB node
             second_trm_rgb_node = nodes.new('ShaderNodeRGB')
@@ -318,30 +527,32 @@ class MaterialProcessor:
             second_to_shade_node = nodes.new('ShaderNodeBsdfDiffuse')
             second_to_shade_node.location = (to_shade_node.location.x, to_shade_node.location.y + 200)
             second_to_shade_node.hide = True
-            links.new(second_trm_rgb_node.outputs['Color'], second_to_shade_node.inputs['Color'])
+            pending_links.append((second_trm_rgb_node.outputs['Color'], second_to_shade_node.inputs['Color']))
 
             # Connect normal to toBSDF
             if self.principled_node.inputs['Normal'].is_linked:
-                links.new(self.principled_node.inputs['Normal'].links[0].from_node.outputs[0], to_shade_node.inputs['Normal'])
-                links.new(self.principled_node.inputs['Normal'].links[0].from_node.outputs[0], second_to_shade_node.inputs['Normal'])
+                normal_output = self.principled_node.inputs['Normal'].links[0].from_node.outputs[0]
+                pending_links.append((normal_output, to_shade_node.inputs['Normal']))
+                pending_links.append((normal_output, second_to_shade_node.inputs['Normal']))
 
             # Connect rgh to toBSDF
             if self.principled_node.inputs['Roughness'].is_linked:
-                links.new(self.principled_node.inputs['Roughness'].links[0].from_node.outputs[0], to_shade_node.inputs['Roughness'])
-                links.new(self.principled_node.inputs['Roughness'].links[0].from_node.outputs[0], second_to_shade_node.inputs['Roughness'])
+                roughness_output = self.principled_node.inputs['Roughness'].links[0].from_node.outputs[0]
+                pending_links.append((roughness_output, to_shade_node.inputs['Roughness']))
+                pending_links.append((roughness_output, second_to_shade_node.inputs['Roughness']))
 
             # 200% mix shade
             trm_add_shader_node = nodes.new('ShaderNodeAddShader')
             trm_add_shader_node.hide = True
             trm_add_shader_node.location = (to_shade_node.location.x + 200, to_shade_node.location.y)
-            links.new(to_shade_node.outputs['BSDF'], trm_add_shader_node.inputs[0])
-            links.new(second_to_shade_node.outputs['BSDF'], trm_add_shader_node.inputs[1])
+            pending_links.append((to_shade_node.outputs['BSDF'], trm_add_shader_node.inputs[0]))
+            pending_links.append((second_to_shade_node.outputs['BSDF'], trm_add_shader_node.inputs[1]))
 
             # knob shade
             knob_mix_shader_node = nodes.new('ShaderNodeMixShader')
             knob_mix_shader_node.location = (trm_add_shader_node.location.x + 200, trm_add_shader_node.location.y)
             knob_mix_shader_node.inputs['Fac'].default_value = 0.5 # default to 100%
-            links.new(trm_add_shader_node.outputs['Shader'], knob_mix_shader_node.inputs[2])
+            pending_links.append((trm_add_shader_node.outputs['Shader'], knob_mix_shader_node.inputs[2]))
 
             final_shade = knob_mix_shader_node
 
@@ -349,79 +560,100 @@ class MaterialProcessor:
                 thc_mix_shader_node = nodes.new('ShaderNodeMixShader')
                 thc_mix_shader_node.hide = True
                 thc_mix_shader_node.location = (final_shade.location.x + 200, final_shade.location.y)
-                links.new(thc_node.outputs['Color'], thc_mix_shader_node.inputs['Fac'])
-                links.new(final_shade.outputs['Shader'], thc_mix_shader_node.inputs[1])
+                pending_links.append((thc_node.outputs['Color'], thc_mix_shader_node.inputs['Fac']))
+                pending_links.append((final_shade.outputs['Shader'], thc_mix_shader_node.inputs[1]))
                 final_shade = thc_mix_shader_node
 
             if mai_node:
                 mai_mix_shader_node = nodes.new('ShaderNodeMixShader')
                 mai_mix_shader_node.hide = True
                 mai_mix_shader_node.location = (final_shade.location.x + 200, final_shade.location.y)
-                links.new(mai_node.outputs['Color'], mai_mix_shader_node.inputs['Fac'])
-                links.new(final_shade.outputs['Shader'], mai_mix_shader_node.inputs[2])
+                pending_links.append((mai_node.outputs['Color'], mai_mix_shader_node.inputs['Fac']))
+                pending_links.append((final_shade.outputs['Shader'], mai_mix_shader_node.inputs[2]))
                 final_shade = mai_mix_shader_node
 
             # Create Final add shader
             add_shader_node = nodes.new('ShaderNodeAddShader')
             add_shader_node.location = (self.principled_node.location.x + 400, self.principled_node.location.y)
-            links.new(final_shade.outputs['Shader'], add_shader_node.inputs[0])
-            links.new(self.principled_node.outputs['BSDF'], add_shader_node.inputs[1])
+            pending_links.append((final_shade.outputs['Shader'], add_shader_node.inputs[0]))
+            pending_links.append((self.principled_node.outputs['BSDF'], add_shader_node.inputs[1]))
 
             # Connect to material output
-            output_node = self.principled_node.outputs['BSDF'].links[0].to_node
+            output_node = self._find_output_node()
             if not output_node:
                 output_node = nodes.new('ShaderNodeOutputMaterial')
 
             output_node.location = (add_shader_node.location.x + 200, add_shader_node.location.y)
 
-            links.new(add_shader_node.outputs['Shader'], output_node.inputs['Surface'])
+            pending_links.append((add_shader_node.outputs['Shader'], output_node.inputs['Surface']))
+
+            for from_socket, to_socket in pending_links:
+                links.new(from_socket, to_socket)
+
+    def _is_grayscale(self, image):
+        """경로별로 흑백 판별 결과를 보관하여 같은 texture의 pixel을 다시 읽지 않는다"""
+        key = self._image_key(image.filepath)
+        if not key:
+            return self._is_grayscale_image(image)
+        is_grayscale = self._grayscale_cache.get(key)
+        if is_grayscale is None:
+            is_grayscale = self._is_grayscale_image(image)
+            self._grayscale_cache[key] = is_grayscale
+        return is_grayscale
 
     def _is_grayscale_image(self, image):
         """흑백 이미지 여부 확인"""
-        pixels = image.pixels[:]
-        for i in range(0, len(pixels), 4):  # RGBA -> 4개씩 묶음
-            r, g, b = pixels[i], pixels[i + 1], pixels[i + 2]
-            if r != g or g != b or b != r:
-                return False  # 색상이 다르면 컬러
-        return True  # 모두 동일하면 흑백
+        # 1채널(L), 2채널(LA) 이미지는 pixel을 읽지 않아도 흑백
+        if image.channels < 3:
+            return True
+
+        # pixels[:] 복사 대신 foreach_get으로 numpy 버퍼에 직접 읽는다
+        buf = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(buf)
+        rgb = buf.reshape(-1, image.channels)[:, :3]
+
+        # 일부 픽셀만 먼저 샘플링하여 컬러 이미지는 빠르게 걸러낸다
+        sample = rgb[::_GRAYSCALE_SAMPLE_STRIDE]
+        if np.any((sample[:, 0] != sample[:, 1]) | (sample[:, 1] != sample[:, 2])):
+            return False
+
+        # 8bit 이미지의 pixels는 이미 정확한 k/255 float이므로 uint8 양자화 없이 그대로 비교한다
+        # 한 픽셀이라도 채널값이 다르면 컬러
+        return not bool(np.any((rgb[:, 0] != rgb[:, 1]) | (rgb[:, 1] != rgb[:, 2])))
 
     def import_emission(self):
         emission_node = None
         if self.principled_node.inputs['Emission Color'].is_linked:
             emission_node = self.principled_node.inputs['Emission Color'].links[0].from_node
         else:
-            emission_node = self.import_texture('_emm')
+            emission_node = self.import_texture('_emm', non_color=None)
             if not emission_node:
-                emission_node = self.import_texture('_emi')
+                emission_node = self.import_texture('_emi', non_color=None)
 
         if emission_node and emission_node.image:
             emission_node.hide = True
             emission_node.location = (self.base_x_position, self.principled_node.location.y - 250)
-            mix_node = self.material.node_tree.nodes.new('ShaderNodeMixRGB')
-            mix_node.blend_type = 'MULTIPLY'
-            mix_node.inputs['Fac'].default_value = 1.0
-            mix_node.location = (emission_node.location.x + 300, emission_node.location.y)
-            mix_node.hide = True
-
-            if self.base_color_node:
-                self.material.node_tree.links.new(self.base_color_node.outputs['Color'], mix_node.inputs[1])
-            self.material.node_tree.links.new(emission_node.outputs['Color'], mix_node.inputs[2])
+            mix_node = self._add_mix(
+                'MULTIPLY',
+                (emission_node.location.x + 300, emission_node.location.y),
+                in1=self.base_color_node.outputs['Color'] if self.base_color_node else None,
+                in2=emission_node.outputs['Color'],
+                hide=True
+            )
 
             final_output_node = mix_node
 
-            if self._is_grayscale_image(emission_node.image):
-                emission_node.image.colorspace_settings.name = 'Non-Color'
-
-                multiply_node = self.material.node_tree.nodes.new('ShaderNodeMixRGB')
-                multiply_node.label = 'Emm Multiply'
-                multiply_node.blend_type = 'MULTIPLY'
-                multiply_node.inputs['Fac'].default_value = 1.0
-                multiply_node.inputs[2].default_value = (1, 1, 1, 1)
-                multiply_node.location = (mix_node.location.x + 200, mix_node.location.y)
+            if self._is_grayscale(emission_node.image):
+                self._apply_colorspace(emission_node, non_color=True)
 
-                self.material.node_tree.links.new(mix_node.outputs['Color'], multiply_node.inputs[1])
-                final_output_node = multiply_node
+                final_output_node = self._add_mix(
+                    'MULTIPLY',
+                    (mix_node.location.x + 200, mix_node.location.y),
+                    in1=mix_node.outputs['Color'],
+                    color2=(1, 1, 1, 1),
+                    label='Emm Multiply'
+                )
 
             # 최종 출력 연결
-            self.material.node_tree.links.new(final_output_node.outputs['Color'], self.principled_node.inputs['Emission Color'])
+            self._links.new(final_output_node.outputs['Color'], self.principled_node.inputs['Emission Color'])
             self.principled_node.inputs['Emission Strength'].default_value = 1.0
@@ -1,6 +1,7 @@
 import bpy
 import os
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .material_processor import MaterialProcessor
 from ...utilities.DAE_OT_import_via_fbx import DAE_OT_import_via_fbx, NotFoundConvertModule, FailConvert
 
@@ -8,6 +9,7 @@ class Queueing:
     def __init__(self, files, directory):
         self.processing_queue = deque()
         self.processing_queue.clear()
+        MaterialProcessor.clear_caches()
 
         for file_elem in files:
             file_path = os.path.join(directory, file_elem.name)
@@ -17,9 +19,11 @@ class Queueing:
             file_ext = file_splitext[1].lower()
             self.processing_queue.append((file_path, dir_path, file_name, file_ext))
 
-    def process_material(self, matarial, file_path):
+    def process_material(self, matarial, file_path, base_name=None):
         """머티리얼 처리 함수"""
-        material_processor = MaterialProcessor(matarial, file_path)
+        material_processor = MaterialProcessor(matarial, file_path, base_name)
+        if not material_processor.has_principled():
+            return
 
         # metallic to 0
         material_processor.principled_node.inputs['Metallic'].default_value = 0
@@ -47,6 +51,28 @@ class Queueing:
             elif bpy.context.scene.shader_mix_style == 'SHADE':
                 material_processor.import_second_shader()
 
+    def texture_suffixes(self, material):
+        """process_material에서 불러올 texture suffix 목록 (prefetch 대상)"""
+        node_tree = material.node_tree
+        principled = MaterialProcessor.find_principled_node(node_tree.nodes)
+        if principled is None:
+            return ()
+        linked_inputs = {link.to_socket.name for link in node_tree.links if link.to_node == principled}
+
+        suffixes = ['_ao', '_tcl', '_nrm']
+        if 'Metallic' not in linked_inputs:
+            suffixes.append('_mtl')
+        if 'Roughness' not in linked_inputs:
+            suffixes.append('_rgh')
+        if 'Alpha' not in linked_inputs:
+            suffixes.append('_opa')
+        if 'Emission Color' not in linked_inputs:
+            # _emm이 없을 때만 _emi를 사용한다
+            suffixes.append(('_emm', '_emi'))
+        if bpy.context.scene.is_apply_second_shader and bpy.context.scene.shader_mix_style in {'COLOR', 'SHADE'}:
+            suffixes.extend(('_trm', '_mai', '_thc'))
+        return suffixes
+
     def process_armature(self, obj, file_name):
         """아마추어 처리 함수"""
         if bpy.context.scene.is_scale_armature_splatoon_scene_importer:
@@ -79,9 +105,19 @@ class Queueing:
                     if slot.material and slot.material.use_nodes:
                         materials.add(slot.material)
 
-        for material in materials:
-            material.blend_method = 'HASHED'
-            self.process_material(material, file_path)
+        base_names = {material: MaterialProcessor.resolve_base_name(material, file_path) for material in materials}
+        prefetch_requests = [(base_names[material], self.texture_suffixes(material)) for material in materials]
+
+        # prefetch worker는 파일 하나를 처리하는 동안만 사용하고 종료한다
+        executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        try:
+            MaterialProcessor.prefetch_textures(executor, prefetch_requests, file_path)
+            for material in materials:
+                material.blend_method = 'HASHED'
+                self.process_material(material, file_path, base_names[material])
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            MaterialProcessor.clear_prefetch()
 
     def process_next_file(self):
         """큐의 다음 파일 처리 함수"""